@@ -25,6 +25,21 @@ except ImportError:
         pass
 
 
+# LVGL constants used on the read/event paths, looked up once at import
+_STATE_PRESSED = lv.INDEV_STATE.PRESSED
+_STATE_RELEASED = lv.INDEV_STATE.RELEASED
+_EVT_LONG = lv.EVENT.LONG_PRESSED
+_EVT_LONG_REPEAT = lv.EVENT.LONG_PRESSED_REPEAT
+_EVT_SHORT_CLICKED = lv.EVENT.SHORT_CLICKED
+
+# Size of the EncoderIRQ ring buffer; must be a power of 2
+_RX_SIZE = 64
+_RX_MASK = _RX_SIZE - 1
+
+# Number of consecutive equal samples (as a bit mask) before the EncoderIRQ switch changes state
+_SW_MASK = 0x07
+
+
 class Encoder():
     """
     Creates an LVGL indev (input device)
@@ -51,90 +66,142 @@ class Encoder():
         display=None,  # Display to register indev
         def_dur=500,  # Default duration for switch push
         fast_mult=5,  # Multiplier for fast jumps
+        create_indev=True,  # False when the read_cb is driven by another indev, eg EncoderWidget
     ):
         group = group if group else lv.group_get_default()
         display = display if display else lv.disp_get_default()
 
         self.def_dur = def_dur
         self.fast_mult = fast_mult
+        self._group = group
 
         self.pressed = False
         self._lastpressed = False
-        self._value = 0
-        self._last_value = self.value()
-        self._value_changed = False
-
-        # Register LVGL indev driver
-        self.indev = lv.indev_create()
-        self.indev.set_type(lv.INDEV_TYPE.ENCODER)
-        self.indev.set_read_cb(self._read_cb)
-
-        self.indev.set_group(group)
-        self.indev.set_disp(display)
+        # Not _value, which RotaryIRQ uses for its own count in EncoderIRQ
+        self._enc_value = 0
+        # Jumps from inc/dec and fast_inc/fast_dec, counted separately so fast_mult is
+        # only applied once per _read_cb rather than on every call
+        self._slow_pending = 0
+        self._fast_pending = 0
+        self._pending = 0  # Encoder steps not yet reported to LVGL
+        self._dirty = False  # Set when there is something for _read_cb to report
+
+        # Timer that releases the switch after push(), created by the first push and
+        # re-armed on each one after that
+        self._release_timer = None
+
+        self.indev = None
+        if create_indev:
+            # Register LVGL indev driver
+            self.indev = lv.indev_create()
+            self.indev.set_type(lv.INDEV_TYPE.ENCODER)
+            self.indev.set_read_cb(self._read_cb)
+
+            self.indev.set_group(group)
+            self.indev.set_disp(display)
 
     #         self.indev.long_press_time = dur
 
     def inc(self, diff=1):
-        self._value += diff
-        self._set_value_changed()
+        self._slow_pending += diff
+        self._dirty = True
 
     def dec(self, diff=1):
-        self._value -= diff
-        self._set_value_changed()
+        self._slow_pending -= diff
+        self._dirty = True
 
     def fast_inc(self, diff=1):
-        self._value += diff * self.fast_mult
-        self._set_value_changed()
+        self._fast_pending += diff
+        self._dirty = True
 
     def fast_dec(self, diff=1):
-        self._value -= diff * self.fast_mult
-        self._set_value_changed()
+        self._fast_pending -= diff
+        self._dirty = True
 
     def push(self, period=None):
         if not period:
             period = self.def_dur
+        t = self._release_timer
+        if t is None:
+            # It pauses itself instead of using a repeat count, which would let LVGL delete it
+            t = self._release_timer = lv.timer_create(self._release_timer_cb, period, None)
+        else:
+            t.set_period(period)
+            t.reset()
+            t.resume()
         self.press_cb()
-        t = lv.timer_create_basic()
-        t.set_period(period)
-        t.set_repeat_count(1)
-        t.set_cb(lambda e: self.release_cb())
 
     def long_push(self):
-        if self.indev.get_group().get_editing():
-            self.indev.get_group().set_editing(False)
-        elif self.indev.get_group().get_focused():
-            self.indev.get_group().get_focused().send_event(lv.EVENT.LONG_PRESSED, None)
+        g = self._group
+        if g.get_editing():
+            g.set_editing(False)
+            return
+        f = g.get_focused()
+        if f:
+            f.send_event(_EVT_LONG, None)
 
     def value(self):
-        return self._value
+        return self._enc_value + self._slow_pending + self._fast_pending * self.fast_mult
+
+    def has_pending(self):
+        return self._dirty
 
     def press_cb(self):
         self.pressed = True
+        self._dirty = True
 
     def release_cb(self):
         self.pressed = False
+        self._dirty = True
 
-    def _set_value_changed(self):
-        self._value_changed = True
+    def _release_timer_cb(self, timer):
+        timer.pause()
+        self.release_cb()
 
     def _read_cb(self, indev, data):
-        if self.pressed != self._lastpressed:
-            if self.pressed:
-                data.state = lv.INDEV_STATE.PRESSED
+        if not self._dirty:
+            return 0
+        # Cleared before reading so a change made while reporting isn't lost
+        self._dirty = False
+
+        pressed = self.pressed
+        if pressed != self._lastpressed:
+            if pressed:
+                data.state = _STATE_PRESSED
             else:
-                data.state = lv.INDEV_STATE.RELEASED
-            self._lastpressed = self.pressed
-
-        if self._value_changed:
-            self._value_changed = False
-            value = self.value()
-            data.enc_diff = value - self._last_value
-            self._last_value = value
+                data.state = _STATE_RELEASED
+            self._lastpressed = pressed
+
+        pending = self._pending
+        slow = self._slow_pending
+        fast = self._fast_pending
+        if slow or fast:
+            self._slow_pending = 0
+            self._fast_pending = 0
+            diff = slow + fast * self.fast_mult
+            self._enc_value += diff
+            pending += diff
+
+        # Report one step per call and ask LVGL to call again while steps remain,
+        # so fast spins are processed within the same tick instead of as one jump
+        if pending:
+            step = 1 if pending > 0 else -1
+            data.enc_diff = step
+            pending -= step
+            self._pending = pending
+            if pending:
+                self._dirty = True
+        if hasattr(data, "continue_reading"):  # Not available on older LVGL
+            data.continue_reading = pending != 0
 
         return 0
 
     def delete(self):
-        self.indev.enable(False)
+        if self.indev:
+            self.indev.enable(False)
+        if self._release_timer:
+            self._release_timer.delete()
+            self._release_timer = None
 
     def get_indev(self, index=0):
         if index == 0:
@@ -154,32 +221,55 @@ class EncoderWidget(lv.obj):
         # parent can be any LVGL container object
         parent = lv.scr_act()
         ew = EncoderWidget(parent, group)
+
+    All of the encoders share one indev, which is pointed at each encoder's group
+    in turn, so get_indev() returns the same indev for every index.  Settings made
+    on it, eg long press time, apply to all of the encoders.
     """
 
-    style_btn_default = lv.style_t()
-    style_btn_default.init()
-    style_btn_default.set_width(lv.pct(33))
-    style_btn_default.set_height(lv.pct(100))
-    style_btn_default.set_radius(lv.RADIUS_CIRCLE)
-    style_btn_default.set_pad_all(1)
-
-    style_btnpressed = lv.style_t()
-    style_btnpressed.init()
-    style_btnpressed.set_transform_width(-10)
-    style_btnpressed.set_transform_height(-10)
-
-    style_default = lv.style_t()
-    style_default.init()
-    style_default.set_pad_all(0)
-    style_default.set_margin_top(1)
-    style_default.set_margin_bottom(1)
-    style_default.set_margin_left(1)
-    style_default.set_margin_right(1)
-    style_default.set_border_width(0)
-    style_default.set_bg_color(lv.palette_lighten(lv.PALETTE.GREY, 1))
-
-    styles = {lv.STATE.DEFAULT: style_default}
-    # styles = {}
+    # The styles are built by the first EncoderWidget rather than at import time,
+    # which may be before LVGL is initialized
+    _styles_built = False
+
+    @classmethod
+    def _build_styles(cls):
+        if cls._styles_built:
+            return
+
+        style_btn_default = lv.style_t()
+        style_btn_default.init()
+        style_btn_default.set_width(lv.pct(33))
+        style_btn_default.set_height(lv.pct(100))
+        style_btn_default.set_radius(lv.RADIUS_CIRCLE)
+        style_btn_default.set_pad_all(1)
+
+        style_btnpressed = lv.style_t()
+        style_btnpressed.init()
+        style_btnpressed.set_transform_width(-10)
+        style_btnpressed.set_transform_height(-10)
+
+        style_default = lv.style_t()
+        style_default.init()
+        style_default.set_pad_all(0)
+        style_default.set_margin_top(1)
+        style_default.set_margin_bottom(1)
+        style_default.set_margin_left(1)
+        style_default.set_margin_right(1)
+        style_default.set_border_width(0)
+        style_default.set_bg_color(lv.palette_lighten(lv.PALETTE.GREY, 1))
+
+        cls.style_btn_default = style_btn_default
+        cls.style_btnpressed = style_btnpressed
+        cls.style_default = style_default
+
+        # (style, state) pairs added to the widget and every encoder container
+        cls._style_pairs = ((style_default, lv.STATE.DEFAULT),)
+        # cls._style_pairs = ()
+
+        # (style, state) pairs added to every encoder button
+        cls._btn_styles = ((style_btn_default, 0), (style_btnpressed, lv.STATE.PRESSED))
+
+        cls._styles_built = True
 
     def __init__(
         self,
@@ -192,6 +282,7 @@ class EncoderWidget(lv.obj):
         styles=None,
         **args,
     ):
+        EncoderWidget._build_styles()
         super().__init__(parent)
 
         if group is None:
@@ -209,59 +300,121 @@ class EncoderWidget(lv.obj):
         height = height if height else 80
         self.set_width(width)
         self.set_height(height)
-        
-        self.indevs=[]
 
-        # style to be used on the containers for each widget
+        self._encs = []
+        self._cursor = 0  # Index of the encoder currently served by the indev
+
+        # style to be used on the containers for each widget, styles is a {state: style} dict
         if styles:
-            self.styles = styles
-        for state, style in self.styles.items():
+            self._style_pairs = tuple((style, state) for state, style in styles.items())
+        for style, state in self._style_pairs:
             self.add_style(style, state)
         self.align(*alignment)
 
+        # Size of each encoder container
+        self._cont_pct_w = lv.pct(99 // self._num_groups)
+        self._cont_pct_h = lv.pct(99)
+
         self.conts = []
         self._widget_group = lv.group_create()  # Create a group for the encoder buttons
+        # Maps id(button) to (short click handler, long press handler)
+        self._btn_handlers = {}
+        self._dispatch_cb = self._dispatch  # Bind once, shared by every button
         for g in groups:
             self._create_encoder(group=g, display=display, **args)
 
+        # One indev serves all of the encoders, switching groups as needed
+        self.indev = lv.indev_create()
+        self.indev.set_type(lv.INDEV_TYPE.ENCODER)
+        self.indev.set_read_cb(self._read_cb)
+        self.indev.set_group(groups[0])
+        self.indev.set_disp(display)
+
     def _create_encoder(self, group, display, **args):
-        enc = Encoder(group, display, **args)
+        enc = Encoder(group, display, create_indev=False, **args)
 
         cont = lv.obj(self)
-        for state, style in self.styles.items():
+        for style, state in self._style_pairs:
             cont.add_style(style, state)
-        cont.set_width(lv.pct(99 // self._num_groups))
-        cont.set_height(lv.pct(99))
+        cont.set_width(self._cont_pct_w)
+        cont.set_height(self._cont_pct_h)
 
         # Create the encoder buttons
         btn_switch = lv.btn(cont)
         btn_switch.set_style_bg_img_src(lv.SYMBOL.NEW_LINE, 0)
         btn_switch.align(lv.ALIGN.CENTER, 0, 0)
-        btn_switch.add_event(lambda e: enc.push(), lv.EVENT.SHORT_CLICKED, None)
-        btn_switch.add_event(lambda e: enc.long_push(), lv.EVENT.LONG_PRESSED, None)
+        self._add_btn_events(btn_switch, enc.push, enc.long_push, _EVT_LONG)
 
         btn_right = lv.btn(cont)
         btn_right.set_style_bg_img_src(lv.SYMBOL.RIGHT, 0)
         btn_right.align(lv.ALIGN.RIGHT_MID, 0, 0)
-        btn_right.add_event(lambda e: enc.inc(), lv.EVENT.SHORT_CLICKED, None)
-        btn_right.add_event(lambda e: enc.inc(), lv.EVENT.LONG_PRESSED_REPEAT, None)
+        self._add_btn_events(btn_right, enc.inc, enc.inc, _EVT_LONG_REPEAT)
 
         btn_left = lv.btn(cont)
         btn_left.set_style_bg_img_src(lv.SYMBOL.LEFT, 0)
         btn_left.align(lv.ALIGN.LEFT_MID, 0, 0)
-        btn_left.add_event(lambda e: enc.dec(), lv.EVENT.SHORT_CLICKED, None)
-        btn_left.add_event(lambda e: enc.dec(), lv.EVENT.LONG_PRESSED_REPEAT, None)
+        self._add_btn_events(btn_left, enc.dec, enc.dec, _EVT_LONG_REPEAT)
 
         # Assign styles to buttons and add buttons to the group
+        btn_styles = self._btn_styles
         for btn in btn_switch, btn_right, btn_left:
-            btn.add_style(self.style_btn_default, 0)
-            btn.add_style(self.style_btnpressed, lv.STATE.PRESSED)
+            for style, state in btn_styles:
+                btn.add_style(style, state)
             self._widget_group.add_obj(btn)
-        self.indevs.append(enc.get_indev())
+        self._encs.append(enc)
         self.conts.append(cont)
 
+    def _add_btn_events(self, btn, short_handler, long_handler, long_event):
+        # Registered per event code rather than with EVENT.ALL, which would call into
+        # Python for every draw, hit test and style event of the button
+        self._btn_handlers[id(btn)] = (short_handler, long_handler)
+        btn.add_event(self._dispatch_cb, _EVT_SHORT_CLICKED, None)
+        btn.add_event(self._dispatch_cb, long_event, None)
+
+    def _dispatch(self, e):
+        short_handler, long_handler = self._btn_handlers[id(e.get_target())]
+        if e.get_code() == _EVT_SHORT_CLICKED:
+            short_handler()
+        else:
+            long_handler()
+
+    def _read_cb(self, indev, data):
+        encs = self._encs
+        enc = encs[self._cursor]
+        if not enc.has_pending():
+            if enc._lastpressed:
+                # Stay on an encoder while it is held, so LVGL sees its release in the
+                # same group instead of a click on another group's focused object
+                return 0
+            # Move to the next encoder with something to report and point the indev at its group.
+            # Only the current encoder has reported a press, so the others start released.
+            n = len(encs)
+            for i in range(1, n):
+                cursor = (self._cursor + i) % n
+                if encs[cursor].has_pending():
+                    self._cursor = cursor
+                    enc = encs[cursor]
+                    indev.set_group(enc._group)
+                    data.state = _STATE_RELEASED
+                    break
+            else:
+                return 0
+
+        enc._read_cb(indev, data)
+
+        # Other encoders can only be served once this one has been released
+        if hasattr(data, "continue_reading") and not data.continue_reading and not enc._lastpressed:
+            for e in encs:
+                if e.has_pending():
+                    data.continue_reading = True
+                    break
+
+        return 0
+
     def get_indev(self, index=0):
-        return self.indevs[index]
+        # The indev is shared by all of the encoders, see the class docstring
+        self._encs[index]  # Raises IndexError for an invalid index
+        return self.indev
 
 class EncoderDisplay(EncoderWidget):
     """
@@ -303,27 +456,120 @@ class EncoderIRQ(Encoder, Rotary):
 
         from lv_encoders import EncoderIRQ
 
-        enc = EncoderIRQ(pin_num_clk=12, pin_num_dt=13,
+        enc = EncoderIRQ(pin_num_clk=12, pin_num_dt=13, pin_num_sw=14,
                          pull_up=True, half_step=True)
+
+    The switch on pin_num_sw is optional and is expected to pull the pin low when pressed.
     """
 
     def __init__(
         self,
         *args,
-        display=lv.disp_get_default(),  # Display to register indev
-        group=lv.group_get_default(),  # Group to register indev
+        display=None,  # Display to register indev
+        group=None,  # Group to register indev
         def_dur=500,  # Default duration for switch push
         fast_mult=5,  # Multiplier for fast jumps
+        pin_num_sw=None,  # Pin for the push switch
+        wake_cb=None,  # Called from the rotary listener after the encoder turns
         **kwargs,
     ):
+        display = display if display else lv.disp_get_default()
+        group = group if group else lv.group_get_default()
         Encoder.__init__(
             self, display=display, group=group, def_dur=def_dur, fast_mult=fast_mult
         )
 
+        # Ring buffer of int8 deltas. Only the listener advances _rx_in and only
+        # _read_cb advances _rx_out, so no locking is needed between them.
+        self._rx = bytearray(_RX_SIZE)
+        self._rx_in = 0
+        self._rx_out = 0
+
+        self._wake_cb = wake_cb
+
         try:
             Rotary.__init__(self, *args, **kwargs)
-            self.add_listener(self._set_value_changed)
+            self._rotary_last = Rotary.value(self)
+            self.add_listener(self._rotary_cb)
         except AttributeError:
             raise ImportError("The micropython-rotary module was not found.")
 
-        # Todo: Setup the switch pin and IRQ here with callback = self._??????
+        # Switch history, one bit per sample, 1 = pressed
+        self._sw_hist = 0
+        # Debounced state of the switch pin, kept apart from self.pressed so sampling
+        # the idle pin doesn't release a software push()
+        self._sw_pressed = False
+        self._sw_pin = None
+        if pin_num_sw is not None:
+            from machine import Pin
+
+            self._sw_pin = Pin(pin_num_sw, Pin.IN, Pin.PULL_UP)
+            self._sw_pin.irq(self._sw_irq, Pin.IRQ_FALLING | Pin.IRQ_RISING)
+
+    def _process_rotary_pins(self, pin):
+        # Debounce the clk/dt phase as a unit: only pass it to the decoder when
+        # two consecutive samples agree
+        phase = (self._hal_get_clk_value() << 1) | self._hal_get_dt_value()
+        if phase == (self._hal_get_clk_value() << 1) | self._hal_get_dt_value():
+            Rotary._process_rotary_pins(self, pin)
+
+    def _sw_irq(self, pin):
+        self._sw_sample(pin.value() ^ 1)
+
+    def _sw_sample(self, raw):
+        # Only commit a state change once the whole sample window agrees
+        hist = ((self._sw_hist << 1) | raw) & _SW_MASK
+        self._sw_hist = hist
+        if hist == _SW_MASK:
+            if not self._sw_pressed:
+                self._sw_pressed = True
+                self.press_cb()
+        elif hist == 0:
+            if self._sw_pressed:
+                self._sw_pressed = False
+                self.release_cb()
+
+    def _rotary_cb(self):
+        rx_in = self._rx_in
+        nxt = (rx_in + 1) & _RX_MASK
+        # If the buffer is full, or the delta doesn't fit in an int8, the rest is left
+        # in the rotary value and picked up by the catch-up in _read_cb
+        if nxt != self._rx_out:
+            diff = Rotary.value(self) - self._rotary_last
+            if diff > 127:
+                diff = 127
+            elif diff < -128:
+                diff = -128
+            self._rotary_last += diff
+            self._rx[rx_in] = diff & 0xFF
+            self._rx_in = nxt
+
+        # micropython-rotary already runs listeners through micropython.schedule, so
+        # call wake_cb directly rather than taking another slot in the schedule queue.
+        # It is only a wake-up, the ring is drained in _read_cb.
+        if self._wake_cb:
+            self._wake_cb()
+
+    def _read_cb(self, indev, data):
+        # Keep sampling the switch so the window fills once the pin is stable
+        if self._sw_pin is not None:
+            self._sw_sample(self._sw_pin.value() ^ 1)
+
+        rx = self._rx
+        rx_out = self._rx_out
+        rx_in = self._rx_in
+        diff = 0
+        while rx_out != rx_in:
+            d = rx[rx_out]
+            diff += d - 256 if d > 127 else d
+            rx_out = (rx_out + 1) & _RX_MASK
+        self._rx_out = rx_out
+
+        # Catch up with rotation the listener never delivered, eg when micropython.schedule's
+        # queue was full.  The listener and _read_cb both run in scheduler/main context.
+        value = Rotary.value(self)
+        diff += value - self._rotary_last
+        self._rotary_last = value
+        if diff:
+            self.inc(diff)
+        return Encoder._read_cb(self, indev, data)